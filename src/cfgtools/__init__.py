@@ -57,6 +57,7 @@ import lazyr
 
 lazyr.VERBOSE = 0
 lazyr.register("yaml")
+lazyr.register("toml")
 lazyr.register(".test_case")
 
 # pylint: disable=wrong-import-position
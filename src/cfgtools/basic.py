@@ -8,7 +8,7 @@ NOTE: this module is private. All functions and objects are available in the mai
 
 import sys
 from dataclasses import dataclass
-from functools import partial
+from functools import lru_cache
 from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Self
 
 from htmlmaster import HTMLTreeMaker
@@ -65,28 +65,6 @@ def colorful_console(string: str, status: "WrapperStatus", replaced: str = "") -
             raise ValueError(f"invalid status: {status!r}")
 
 
-def colorful_html(
-    color_scheme: "ColorScheme",
-    string: str,
-    status: "WrapperStatus",
-    replaced: str = "",
-) -> str:
-    """Make string colorful in html."""
-    color = colorful_style(color_scheme, status)
-    match status:
-        case "":
-            return string
-        case "a" | "d":
-            return f"<span style={color}>{string}</span>"
-        case "r":
-            return (
-                f"<span style={colorful_style(color_scheme, 'd')}>{replaced}</span>"
-                f"<span style={color}>{string}</span>"
-            )
-        case _:
-            raise ValueError(f"invalid status: {status!r}")
-
-
 def colorful_style(color_scheme: "ColorScheme", status: "WrapperStatus") -> str:
     """Return coloful css style."""
     _, r, g = get_bg_colors(color_scheme)
@@ -125,16 +103,24 @@ class BasicWrapper:
     }
 
     def __new__(cls, data: "DataObj", *args, **kwargs) -> Self:
-        if isinstance(data, cls):
+        try:
+            new_class = _NEW_CLASSES[cls][type(data)]
+        except KeyError:
+            new_class = _MISSING
+        if new_class is _MISSING:
+            if isinstance(data, cls):
+                new_class = None
+            elif isinstance(data, dict):
+                new_class = cls.sub_constructors[dict]()
+            elif isinstance(data, list):
+                new_class = cls.sub_constructors[list]()
+            elif isinstance(data, cls.valid_types):
+                new_class = cls
+            else:
+                raise TypeError(f"invalid type of data: {data.__class__.__name__!r}")
+            _NEW_CLASSES.setdefault(cls, {})[type(data)] = new_class
+        if new_class is None:
             return data
-        if isinstance(data, dict):
-            new_class = cls.sub_constructors[dict]()
-        elif isinstance(data, list):
-            new_class = cls.sub_constructors[list]()
-        elif isinstance(data, cls.valid_types):
-            new_class = cls
-        else:
-            raise TypeError(f"invalid type of data: {data.__class__.__name__!r}")
         return cls.constructor.__new__(new_class)
 
     def __init__(self, data: "DataObj") -> None:
@@ -300,12 +286,19 @@ class BasicWrapper:
 
         """
         _, _, _ = is_change_view, color_scheme, status
-        value = repr(self.__obj).replace(">", "&gt").replace("<", "&lt")
-        return HTMLTreeMaker(value)
+        return HTMLTreeMaker(_html_escape(repr(self.__obj)))
 
     def get_max_line_width(self) -> int:
         """Get the module variable `MAX_LINE_WIDTH`."""
-        return getattr(sys.modules[__name__.rpartition(".")[0]], "MAX_LINE_WIDTH")
+        return _PACKAGE.MAX_LINE_WIDTH
+
+    def get_raw_data(self) -> "DataObj":
+        """
+        Return the stored data, whose nested containers may not be wrapped
+        yet.
+
+        """
+        return self.__obj
 
     def recover(self) -> None:
         """Recover the original data."""
@@ -389,18 +382,18 @@ class DictBasicWrapper(BasicWrapper):
 
     def __init__(self, obj: "DataObj", *args, **kwargs) -> None:
         super().__init__(obj, *args, **kwargs)
-        new_obj: dict["BasicObj", BasicWrapper] = {}
+        valid_types, constructor = self.valid_types, self.constructor
+        key_types = _exact_types(valid_types)
+        value_types = _exact_types(constructor.valid_types)
+        new_obj: dict["BasicObj", "BasicWrapper | DataObj"] = {}
         for k, v in obj.items():
-            if not isinstance(k, self.valid_types):
+            if type(k) not in key_types and not isinstance(k, valid_types):
                 raise TypeError(f"invalid type of key: {k.__class__.__name__!r}")
-            if isinstance(v, self.constructor):
-                new_obj[k] = v
-            else:
-                new_obj[k] = self.constructor(v)
+            new_obj[k] = v if type(v) in value_types else _copy_data(v, constructor)
         self.__obj = new_obj
 
     def __getitem__(self, key: "BasicObj", /) -> Self:
-        value = self.__obj[key]
+        value = self.__child(key)
         if value.is_deleted():
             raise KeyError(f"{key!r}")
         return value
@@ -409,7 +402,7 @@ class DictBasicWrapper(BasicWrapper):
         if not isinstance(value, self.constructor):
             value = self.constructor(value)
         if key in self.__obj:
-            if r := self.__obj[key].replaced_value():
+            if r := self.__child(key).replaced_value():
                 value.mark_as_replaced(r)
             else:
                 value.mark_as_replaced(self.__obj[key])
@@ -418,27 +411,30 @@ class DictBasicWrapper(BasicWrapper):
         self.__obj[key] = value
 
     def __delitem__(self, key: "BasicObj", /) -> None:
-        self.__obj[key].delete()
+        self.__child(key).delete()
 
     def __len__(self) -> int:
-        return len(self.unwrap_top_level())
+        return sum(_is_present(v) for v in self.__obj.values())
 
     def __contains__(self, key: "BasicObj", /) -> bool:
-        if key in self.__obj and self.__obj[key].is_present():
+        if key in self.__obj and _is_present(self.__obj[key]):
             return True
         return False
 
     def __iter__(self) -> Iterator[Self]:
-        return iter(self.unwrap_top_level())
+        return iter([k for k, v in self.__obj.items() if _is_present(v)])
 
     def repr(self, level: int = 0, is_change_view: bool = False, /) -> str:
+        max_line_width = self.get_max_line_width()
         if level == 0:
-            lenflat, flat = self.repr_flat(is_change_view)
-            if lenflat <= self.get_max_line_width():
+            if is_change_view:
+                lenflat, flat = self.repr_flat(True)
+                if lenflat <= max_line_width:
+                    return flat
+            elif (flat := _repr_flat(self, max_line_width)) is not None:
                 return flat
         seps = _sep(level + 1)
         lines: list[str] = []
-        max_line_width = self.get_max_line_width()
         for k, v in self.__obj.items():
             self.__subrepr(k, v, is_change_view, seps, max_line_width, level, lines)
         string = "{\n" + "\n".join(lines) + f"\n{_sep(level)}" "}"
@@ -447,14 +443,16 @@ class DictBasicWrapper(BasicWrapper):
     def __subrepr(
         self,
         k: "BasicObj",
-        v: BasicWrapper,
+        v: "BasicWrapper | DataObj",
         is_change_view: bool,
         seps: str,
         max_line_width: int,
         level: int,
         lines: list[str],
     ) -> None:
-        if is_change_view:
+        if not isinstance(v, BasicWrapper):
+            _status = ""
+        elif is_change_view:
             _status = v.get_status()
         else:
             if v.is_deleted():
@@ -473,12 +471,20 @@ class DictBasicWrapper(BasicWrapper):
             _status = "a"
         _head = lines[-1] if lines else ""
         _key = f"{k!r}: "
-        _lenflat, _flat = v.repr_flat(is_change_view)
+        if not is_change_view:
+            _flat = _repr_flat(v, max_line_width - len(seps) - len(_key))
+            _lenflat = max_line_width if _flat is None else len(_flat)
+        elif isinstance(v, BasicWrapper):
+            _lenflat, _flat = v.repr_flat(True)
+        else:
+            _lenflat, _flat = _repr_unchanged(v)
         if lines and (len(_head) + len(_key) + _lenflat + 2 <= max_line_width):
             lines[-1] += colorful_console(f" {_key}{_flat},", _status)
         elif len(seps) + len(_key) + _lenflat < max_line_width:
             lines.append(colorful_console(f"{seps}{_key}{_flat},", _status))
         else:
+            if not isinstance(v, BasicWrapper):
+                v = self.constructor(v)
             _child = v.repr(level + 1, is_change_view)
             lines.append(colorful_console(f"{seps}{_key}{_child},", _status))
 
@@ -496,14 +502,18 @@ class DictBasicWrapper(BasicWrapper):
         length = 0
         for i, item in enumerate(self.__obj.items()):
             k, v = item
-            _status = v.get_status()
-            _lenr, _r = (
-                v.replaced_value().repr_flat(False, colorful_func)
-                if _status == "r"
-                else (0, "")
-            )
+            if isinstance(v, BasicWrapper):
+                _status = v.get_status()
+                _lenr, _r = (
+                    v.replaced_value().repr_flat(False, colorful_func)
+                    if _status == "r"
+                    else (0, "")
+                )
+                _lenflat, _flat = v.repr_flat(True, colorful_func)
+            else:
+                _status, _lenr, _r = "", 0, ""
+                _lenflat, _flat = _repr_unchanged(v)
             _key = f"{k!r}: "
-            _lenflat, _flat = v.repr_flat(True, colorful_func)
             if _status == "r":
                 _lenflat += len(_key) + _lenr + 2
             if maxi <= 1:
@@ -524,7 +534,7 @@ class DictBasicWrapper(BasicWrapper):
         return length, string
 
     def keys(self) -> Iterable["BasicObj"]:
-        return self.unwrap_top_level().keys()
+        return {k: v for k, v in self.__obj.items() if _is_present(v)}.keys()
 
     def values(self) -> Iterable[Self]:
         return self.unwrap_top_level().values()
@@ -533,9 +543,10 @@ class DictBasicWrapper(BasicWrapper):
         return self.unwrap_top_level().items()
 
     def unwrap(self) -> "UnwrappedDataObj":
-        return {k: v.unwrap() for k, v in self.__obj.items() if v.is_present()}
+        return _unwrap_data(self.__obj)
 
     def unwrap_top_level(self) -> "DataObj":
+        self.__wrap_all()
         return {k: v for k, v in self.__obj.items() if v.is_present()}
 
     def isinstance(self, cls: type) -> bool:
@@ -547,17 +558,22 @@ class DictBasicWrapper(BasicWrapper):
     def asdict(self) -> dict["BasicObj", "UnwrappedDataObj"]:
         return self.unwrap()
 
+    def get_raw_data(self) -> "DataObj":
+        return self.__obj
+
     def get_html_node(
         self,
         is_change_view: bool = False,
         color_scheme: "ColorScheme" = "dark",
         status: "WrapperStatus" = "",
     ) -> HTMLTreeMaker:
-        lenflat, flat = self.repr_flat(
-            is_change_view, partial(colorful_html, color_scheme)
-        )
-        if lenflat <= self.get_max_line_width():
-            return HTMLTreeMaker(flat)
+        max_line_width = self.get_max_line_width()
+        if is_change_view:
+            lenflat, flat = self.repr_flat(True)
+            if lenflat <= max_line_width:
+                return HTMLTreeMaker(_console_to_html(_html_escape(flat), color_scheme))
+        elif (flat := _repr_flat(self, max_line_width)) is not None:
+            return HTMLTreeMaker(_html_escape(flat))
         maker = HTMLTreeMaker("{")
         maker.addspan(" ... },", spancls="closed")
         for k, v in self.__obj.items():
@@ -568,12 +584,14 @@ class DictBasicWrapper(BasicWrapper):
     def __get_html_subnode(
         self,
         k: "DataObj",
-        v: BasicWrapper,
+        v: "BasicWrapper | DataObj",
         is_change_view: bool,
         status: "WrapperStatus",
         color_scheme: "ColorScheme",
         maker: HTMLTreeMaker,
     ) -> HTMLTreeMaker:
+        if not isinstance(v, BasicWrapper):
+            v = self.constructor(v)
         if not is_change_view and v.is_deleted():
             return
         if is_change_view and v.get_status() == "r":
@@ -582,9 +600,9 @@ class DictBasicWrapper(BasicWrapper):
             )
         _status = status if status else v.get_status()
         node = v.get_html_node(is_change_view, color_scheme, _status)
+        node_value = _html_escape(f"{k!r}: ") + node.getval()
         if is_change_view:
             color = colorful_style(color_scheme, _status)
-            node_value = f"{k!r}: {node.getval()}"
             if node.has_child():
                 node_value = f'<span style="{color}">' + node_value.replace(
                     "<span", f'</span><span style="{color}"'
@@ -598,7 +616,7 @@ class DictBasicWrapper(BasicWrapper):
                 node.setval("")
                 node.addspan(node_value + ",", style=color)
         else:
-            node.setval(f"{k!r}: {node.getval()}")
+            node.setval(node_value)
             if node.has_child():
                 tail = node.get(-1)
                 tail.addval(",")
@@ -608,6 +626,7 @@ class DictBasicWrapper(BasicWrapper):
 
     def recover(self) -> None:
         super().recover()
+        self.__wrap_all()
         for k, v in self.__obj.items():
             match v.get_status():
                 case "a":
@@ -621,6 +640,17 @@ class DictBasicWrapper(BasicWrapper):
     def has_flag(self, flag: Flag, /) -> bool:
         return any(k == flag or v.has_flag(flag) for k, v in self.items())
 
+    def __child(self, key: "BasicObj") -> BasicWrapper:
+        value = self.__obj[key]
+        if not isinstance(value, BasicWrapper):
+            value = self.__obj[key] = self.constructor(value)
+        return value
+
+    def __wrap_all(self) -> None:
+        for k, v in self.__obj.items():
+            if not isinstance(v, BasicWrapper):
+                self.__obj[k] = self.constructor(v)
+
     def replace_flags(
         self, recorder: dict[str, "DataObj"] | None = None, /
     ) -> dict[str, "DataObj"]:
@@ -641,16 +671,14 @@ class ListBasicWrapper(BasicWrapper):
 
     def __init__(self, obj: "DataObj", *args, **kwargs) -> None:
         super().__init__(obj, *args, **kwargs)
-        new_obj: list[BasicWrapper] = []
-        for x in obj:
-            if isinstance(x, self.constructor):
-                new_obj.append(x)
-            else:
-                new_obj.append(self.constructor(x))
-        self.__obj = new_obj
+        constructor = self.constructor
+        value_types = _exact_types(constructor.valid_types)
+        self.__obj: list["BasicWrapper | DataObj"] = [
+            x if type(x) in value_types else _copy_data(x, constructor) for x in obj
+        ]
 
     def __getitem__(self, key: int, /) -> Self:
-        value = self.__obj[key]
+        value = self.__child(key)
         if value.is_deleted():
             raise KeyError(f"{key!r}")
         return value
@@ -658,17 +686,17 @@ class ListBasicWrapper(BasicWrapper):
     def __setitem__(self, key: int, value: "DataObj", /) -> None:
         if not isinstance(value, self.constructor):
             value = self.constructor(value)
-        if r := self.__obj[key].replaced_value():
+        if r := self.__child(key).replaced_value():
             value.mark_as_replaced(r)
         else:
             value.mark_as_replaced(self.__obj[key])
         self.__obj[key] = value
 
     def __delitem__(self, key: int, /) -> None:
-        self.__obj[key].delete()
+        self.__child(key).delete()
 
     def __len__(self) -> int:
-        return len(self.unwrap_top_level())
+        return sum(_is_present(x) for x in self.__obj)
 
     def __contains__(self, value: "BasicObj", /) -> bool:
         return value in self.unwrap_top_level()
@@ -677,13 +705,16 @@ class ListBasicWrapper(BasicWrapper):
         return iter(self.unwrap_top_level())
 
     def repr(self, level: int = 0, is_change_view: bool = False, /) -> str:
+        max_line_width = self.get_max_line_width()
         if level == 0:
-            lenflat, flat = self.repr_flat(is_change_view)
-            if lenflat <= self.get_max_line_width():
+            if is_change_view:
+                lenflat, flat = self.repr_flat(True)
+                if lenflat <= max_line_width:
+                    return flat
+            elif (flat := _repr_flat(self, max_line_width)) is not None:
                 return flat
         seps = _sep(level + 1)
         lines: list[str] = []
-        max_line_width = self.get_max_line_width()
         for x in self.__obj:
             self.__subrepr(x, is_change_view, seps, max_line_width, level, lines)
         string = "[\n" + "\n".join(lines) + f"\n{_sep(level)}" + "]"
@@ -691,14 +722,16 @@ class ListBasicWrapper(BasicWrapper):
 
     def __subrepr(
         self,
-        x: BasicWrapper,
+        x: "BasicWrapper | DataObj",
         is_change_view: bool,
         seps: str,
         max_line_width: int,
         level: int,
         lines: list[str],
     ) -> None:
-        if is_change_view:
+        if not isinstance(x, BasicWrapper):
+            _status = ""
+        elif is_change_view:
             _status = x.get_status()
         else:
             if x.is_deleted():
@@ -710,12 +743,20 @@ class ListBasicWrapper(BasicWrapper):
             )
             _status = "a"
         _head = lines[-1] if lines else ""
-        _lenflat, _flat = x.repr_flat(is_change_view)
+        if not is_change_view:
+            _flat = _repr_flat(x, max_line_width - len(seps))
+            _lenflat = max_line_width if _flat is None else len(_flat)
+        elif isinstance(x, BasicWrapper):
+            _lenflat, _flat = x.repr_flat(True)
+        else:
+            _lenflat, _flat = _repr_unchanged(x)
         if lines and (len(_head) + _lenflat + 2 <= max_line_width):
             lines[-1] += colorful_console(f" {_flat},", _status)
         elif len(seps) + _lenflat < max_line_width:
             lines.append(colorful_console(f"{seps}{_flat},", _status))
         else:
+            if not isinstance(x, BasicWrapper):
+                x = self.constructor(x)
             _child = x.repr(level + 1, is_change_view)
             lines.append(colorful_console(f"{seps}{_child},", _status))
 
@@ -732,13 +773,17 @@ class ListBasicWrapper(BasicWrapper):
         maxi = len(self.__obj)
         length = 0
         for i, x in enumerate(self.__obj):
-            _status = x.get_status()
-            _lenr, _r = (
-                x.replaced_value().repr_flat(False, colorful_func)
-                if _status == "r"
-                else (0, "")
-            )
-            _lenflat, _flat = x.repr_flat(True, colorful_func)
+            if isinstance(x, BasicWrapper):
+                _status = x.get_status()
+                _lenr, _r = (
+                    x.replaced_value().repr_flat(False, colorful_func)
+                    if _status == "r"
+                    else (0, "")
+                )
+                _lenflat, _flat = x.repr_flat(True, colorful_func)
+            else:
+                _status, _lenr, _r = "", 0, ""
+                _lenflat, _flat = _repr_unchanged(x)
             if _status == "r":
                 _lenflat += _lenr + 2
             if maxi <= 1:
@@ -763,16 +808,19 @@ class ListBasicWrapper(BasicWrapper):
         self.__obj.append(obj)
 
     def extend(self, iterable: Iterable["DataObj"], /) -> None:
-        if not isinstance(iterable, self.__class__):
-            iterable = self.constructor(list(iterable))
-        for x in iterable:
+        constructor = self.constructor
+        new_items = [
+            x if isinstance(x, constructor) else constructor(x) for x in iterable
+        ]
+        for x in new_items:
             x.mark_as_added()
-        self.__obj.extend(list(iterable))
+        self.__obj.extend(new_items)
 
     def unwrap(self) -> "UnwrappedDataObj":
-        return [x.unwrap() for x in self.__obj if x.is_present()]
+        return _unwrap_data(self.__obj)
 
     def unwrap_top_level(self) -> "DataObj":
+        self.__wrap_all()
         return [x for x in self.__obj if x.is_present()]
 
     def isinstance(self, cls: type) -> bool:
@@ -784,17 +832,22 @@ class ListBasicWrapper(BasicWrapper):
     def aslist(self) -> list["UnwrappedDataObj"]:
         return self.unwrap()
 
+    def get_raw_data(self) -> "DataObj":
+        return self.__obj
+
     def get_html_node(
         self,
         is_change_view: bool = False,
         color_scheme: "ColorScheme" = "dark",
         status: "WrapperStatus" = "",
     ) -> HTMLTreeMaker:
-        lenflat, flat = self.repr_flat(
-            is_change_view, partial(colorful_html, color_scheme)
-        )
-        if lenflat <= self.get_max_line_width():
-            return HTMLTreeMaker(flat)
+        max_line_width = self.get_max_line_width()
+        if is_change_view:
+            lenflat, flat = self.repr_flat(True)
+            if lenflat <= max_line_width:
+                return HTMLTreeMaker(_console_to_html(_html_escape(flat), color_scheme))
+        elif (flat := _repr_flat(self, max_line_width)) is not None:
+            return HTMLTreeMaker(_html_escape(flat))
         maker = HTMLTreeMaker("[")
         maker.addspan(" ... ],", spancls="closed")
         for x in self.__obj:
@@ -804,12 +857,14 @@ class ListBasicWrapper(BasicWrapper):
 
     def __get_html_subnode(
         self,
-        x: BasicWrapper,
+        x: "BasicWrapper | DataObj",
         is_change_view: bool,
         status: "WrapperStatus",
         color_scheme: "ColorScheme",
         maker: HTMLTreeMaker,
     ) -> HTMLTreeMaker:
+        if not isinstance(x, BasicWrapper):
+            x = self.constructor(x)
         if not is_change_view and x.is_deleted():
             return
         if is_change_view and x.get_status() == "r":
@@ -841,6 +896,7 @@ class ListBasicWrapper(BasicWrapper):
 
     def recover(self) -> None:
         super().recover()
+        self.__wrap_all()
         for i, x in enumerate(self.__obj):
             match x.get_status():
                 case "a":
@@ -854,6 +910,19 @@ class ListBasicWrapper(BasicWrapper):
     def has_flag(self, flag: Flag, /) -> bool:
         return any(x.has_flag(flag) for x in self)
 
+    def __child(self, key: int) -> BasicWrapper:
+        if isinstance(key, slice):
+            raise TypeError(f"{self.__class__.__name__} does not support slicing")
+        value = self.__obj[key]
+        if not isinstance(value, BasicWrapper):
+            value = self.__obj[key] = self.constructor(value)
+        return value
+
+    def __wrap_all(self) -> None:
+        for i, x in enumerate(self.__obj):
+            if not isinstance(x, BasicWrapper):
+                self.__obj[i] = self.constructor(x)
+
     def replace_flags(
         self, recorder: dict[str, "DataObj"] | None = None, /
     ) -> dict[str, "DataObj"]:
@@ -896,5 +965,151 @@ def get_bg_colors(color_scheme: "ColorScheme") -> tuple[str, str, str]:
             raise ValueError(f"invalid color scheme: {color_scheme!r}")
 
 
+_PACKAGE = sys.modules[__name__.rpartition(".")[0]]
+
+
+def _html_escape(string: str) -> str:
+    return string.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _repr_unchanged(data: "DataObj") -> tuple[int, str]:
+    """Represent unwrapped data in one line, as `repr_flat(True)` would."""
+    string = repr(data)
+    return len(string) - 2 * _count_containers(data), string
+
+
+def _count_containers(data: "DataObj") -> int:
+    if isinstance(data, dict):
+        return 1 + sum(map(_count_containers, data.values()))
+    if isinstance(data, list):
+        return 1 + sum(map(_count_containers, data))
+    return 0
+
+
+def _console_to_html(string: str, color_scheme: "ColorScheme") -> str:
+    added = f"<span style={colorful_style(color_scheme, 'a')}>"
+    deleted = f"<span style={colorful_style(color_scheme, 'd')}>"
+    return (
+        string.replace("\033[48;5;028m", added)
+        .replace("\033[48;5;088m", deleted)
+        .replace("\033[0m", "</span>")
+    )
+
+
 def _sep(level: int) -> str:
-    return "    " * level
+    return _SEPS[level] if 0 <= level < len(_SEPS) else "    " * level
+
+
+_SEPS = tuple("    " * i for i in range(64))
+
+
+def _repr_flat(data: "BasicWrapper | DataObj", budget: int) -> str | None:
+    """Return `repr(_unwrap_data(data))`, or None if it is longer than `budget`."""
+    buf: list[str] = []
+    return "".join(buf) if _fill_repr_flat(data, budget, buf) >= 0 else None
+
+
+def _fill_repr_flat(data: "BasicWrapper | DataObj", budget: int, buf: list[str]) -> int:
+    if isinstance(data, BasicWrapper):
+        data = data.get_raw_data()
+    if isinstance(data, dict):
+        left, right, values = "{", "}", data.values()
+        items = ((f"{k!r}: ", v) for k, v in data.items() if _is_present(v))
+    elif isinstance(data, list):
+        left, right, values = "[", "]", data
+        items = (("", x) for x in data if _is_present(x))
+    else:
+        values = None
+    if values is None or all(type(x) in _LEAF_TYPES for x in values):
+        if values is not None and 3 * len(values) > budget:
+            return -1
+        string = repr(data)
+        buf.append(string)
+        return budget - len(string)
+    buf.append(left)
+    budget -= 1
+    sep = ""
+    for key, v in items:
+        if budget < 0:
+            return budget
+        buf.append(f"{sep}{key}")
+        budget = _fill_repr_flat(v, budget - len(sep) - len(key), buf)
+        sep = ", "
+    buf.append(right)
+    return budget - 1
+
+
+_LEAF_TYPES = frozenset((str, int, float, bool, type(None)))
+_NEW_CLASSES: dict[type[BasicWrapper], dict[type, type[BasicWrapper] | None]] = {}
+_MISSING = object()
+
+
+class _RawDict(dict):
+    """Validated copy of a dict that has not been wrapped yet."""
+
+
+class _RawList(list):
+    """Validated copy of a list that has not been wrapped yet."""
+
+
+@lru_cache(maxsize=None)
+def _exact_types(valid_types: tuple[type, ...]) -> frozenset[type]:
+    return frozenset(valid_types)
+
+
+def _copy_data(data: "DataObj", constructor: type[BasicWrapper]) -> "DataObj":
+    """
+    Validate and copy the data without wrapping it, unless it contains
+    wrappers.
+
+    """
+    if isinstance(data, (_RawDict, _RawList)):
+        return data
+    if isinstance(data, dict):
+        valid_types = constructor.valid_types
+        exact_types = _exact_types(valid_types)
+        new_data, wrapped = _RawDict(), False
+        for k, v in data.items():
+            if type(k) not in exact_types and not isinstance(k, valid_types):
+                raise TypeError(f"invalid type of key: {k.__class__.__name__!r}")
+            if type(v) not in exact_types:
+                v = _copy_data(v, constructor)
+                wrapped = wrapped or isinstance(v, BasicWrapper)
+            new_data[k] = v
+        return constructor(new_data) if wrapped else new_data
+    if isinstance(data, list):
+        exact_types = _exact_types(constructor.valid_types)
+        new_data, wrapped = _RawList(), False
+        for x in data:
+            if type(x) not in exact_types:
+                x = _copy_data(x, constructor)
+                wrapped = wrapped or isinstance(x, BasicWrapper)
+            new_data.append(x)
+        return constructor(new_data) if wrapped else new_data
+    if isinstance(data, BasicWrapper):
+        return data if isinstance(data, constructor) else constructor(data)
+    if isinstance(data, constructor.valid_types):
+        return data
+    raise TypeError(f"invalid type of data: {data.__class__.__name__!r}")
+
+
+def _unwrap_data(data: "BasicWrapper | DataObj") -> "UnwrappedDataObj":
+    if isinstance(data, dict):
+        return {
+            k: v if type(v) in _LEAF_TYPES else _unwrap_data(v)
+            for k, v in data.items()
+            if type(v) in _LEAF_TYPES or _is_present(v)
+        }
+    if isinstance(data, list):
+        return [
+            x if type(x) in _LEAF_TYPES else _unwrap_data(x)
+            for x in data
+            if type(x) in _LEAF_TYPES or _is_present(x)
+        ]
+    if isinstance(data, BasicWrapper):
+        return data.unwrap()
+    return data
+
+
+def _is_present(data: "BasicWrapper | DataObj") -> bool:
+    return not isinstance(data, BasicWrapper) or data.is_present()
@@ -7,8 +7,10 @@ NOTE: this module is private. All functions and objects are available in the mai
 """
 
 import json
+import os
+from functools import lru_cache
 from pathlib import Path
-from typing import TYPE_CHECKING, Callable, Self
+from typing import TYPE_CHECKING, Self
 
 from htmlmaster import HTMLTreeMaker
 
@@ -19,6 +21,7 @@ from .basic import (
     BasicWrapper,
     DictBasicWrapper,
     ListBasicWrapper,
+    _html_escape,
 )
 from .saver import ConfigSaver, FileFormatError
 from .templatelib import ConfigTemplate
@@ -122,11 +125,7 @@ class ConfigIOWrapper(BasicWrapper, ConfigSaver):
         self.save()
 
     def __repr__(self) -> str:
-        if len(flat := repr(self.unwrap())) <= self.get_max_line_width():
-            s = flat
-        else:
-            s = self.repr()
-        return f"cfgtools.config({s})"
+        return f"cfgtools.config({self.repr()})"
 
     def to_html(
         self, is_change_view: bool = False, color_scheme: "ColorScheme" = "dark"
@@ -134,8 +133,10 @@ class ConfigIOWrapper(BasicWrapper, ConfigSaver):
         main_maker = super().to_html(is_change_view, color_scheme)
         main_maker.add("", licls="i")
         main_maker.get(-1).addspan(
-            f"format: {self.fileformat!r} | path: {self.path!r} "
-            f"| encoding: {self.encoding!r}"
+            _html_escape(
+                f"format: {self.fileformat!r} | path: {self.path!r} "
+                f"| encoding: {self.encoding!r}"
+            )
         )
         return main_maker
 
@@ -170,13 +171,14 @@ class ConfigIOWrapper(BasicWrapper, ConfigSaver):
 
         if template.isinstance((dict, list)):
             return None
-        if template.isinstance(type):
-            if self.isinstance(template.unwrap_top_level()):
+        expected = template.unwrap_top_level()
+        if isinstance(expected, type):
+            if self.isinstance(expected):
                 return self.copy()
-        elif template.isinstance(Callable):
-            if template.unwrap_top_level()(self):
+        elif callable(expected):
+            if expected(self):
                 return self.copy()
-        elif self.unwrap_top_level() == template.unwrap_top_level():
+        elif self.unwrap_top_level() == expected:
             return self.copy()
 
         if recorder:
@@ -276,25 +278,24 @@ class ConfigIOWrapper(BasicWrapper, ConfigSaver):
                 )
             path = self.path
         if fileformat is None:
-            if (suffix := Path(path).suffix) in SUFFIX_MAPPING:
-                fileformat = SUFFIX_MAPPING[suffix]
+            if (suffix_format := _suffix_format(path)) is not None:
+                fileformat = suffix_format
             else:
                 fileformat = "json" if self.fileformat is None else self.fileformat
         encoding = self.encoding if encoding is None else encoding
-        if fileformat in FORMAT_MAPPING:
-            super().save(path, FORMAT_MAPPING[fileformat], encoding=encoding)
-        else:
+        if (mapped_format := FORMAT_MAPPING.get(fileformat)) is None:
             raise FileFormatError(f"unsupported config file format: {fileformat!r}")
+        super().save(path, mapped_format, encoding=encoding)
 
     def as_ini_dict(self) -> dict:
         obj = self.unwrap()
         if isinstance(obj, dict):
             if all(isinstance(v, dict) for v in obj.values()):
                 return {
-                    k: {x: json.dumps(y) for x, y in v.items()} for k, v in obj.items()
+                    k: {x: _ini_value(y) for x, y in v.items()} for k, v in obj.items()
                 }
-            return {"null": {k: json.dumps(v) for k, v in obj.items()}}
-        return {"null": {"null": json.dumps(obj)}}
+            return {"null": {k: _ini_value(v) for k, v in obj.items()}}
+        return {"null": {"null": _ini_value(obj)}}
 
     def as_toml_dict(self) -> dict:
         obj = self.unwrap()
@@ -303,6 +304,22 @@ class ConfigIOWrapper(BasicWrapper, ConfigSaver):
         return _as_toml(obj)
 
 
+@lru_cache(maxsize=128)
+def _suffix_format(path: str | Path) -> "ConfigFileFormat | None":
+    path = os.fspath(path).rstrip(os.sep + (os.altsep or ""))
+    return SUFFIX_MAPPING.get(os.path.splitext(path)[1].lower())
+
+
+def _ini_value(obj: "UnwrappedDataObj") -> str:
+    if (t := type(obj)) is int:
+        return repr(obj)
+    if t is bool:
+        return "true" if obj else "false"
+    if obj is None:
+        return "null"
+    return json.dumps(obj)
+
+
 def _as_toml(obj: "UnwrappedDataObj") -> "UnwrappedDataObj":
     if isinstance(obj, dict):
         return {k: _as_toml(v) for k, v in obj.items()}
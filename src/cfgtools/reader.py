@@ -6,6 +6,7 @@ NOTE: this module is private. All functions and objects are available in the mai
 
 """
 
+import io
 import json
 import pickle
 from configparser import (
@@ -15,12 +16,10 @@ from configparser import (
     ParsingError,
 )
 from pathlib import Path
-from typing import TYPE_CHECKING, Callable
+from typing import TYPE_CHECKING, Callable, TextIO
 
 import toml
 import yaml
-from yaml import MarkedYAMLError
-from yaml.reader import ReaderError
 
 from .iowrapper import FORMAT_MAPPING, ConfigIOWrapper
 from .saver import FileFormatError
@@ -78,10 +77,9 @@ def read_yaml(path: str | Path, /, encoding: str | None = None) -> ConfigIOWrapp
         A wrapper for reading and writing config files.
 
     """
-    encoding = detect_encoding(path) if encoding is None else encoding
-    with open(path, "r", encoding=encoding) as f:
-        cfg = yaml.safe_load(f)
-    return ConfigIOWrapper(cfg, "yaml", path=path, encoding=encoding)
+    with _open_text(path, encoding) as f:
+        cfg = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    return ConfigIOWrapper(cfg, "yaml", path=path, encoding=f.encoding)
 
 
 def read_pickle(path: str | Path, /) -> ConfigIOWrapper:
@@ -122,10 +120,9 @@ def read_json(path: str | Path, /, encoding: str | None = None) -> ConfigIOWrapp
         A wrapper for reading and writing config files.
 
     """
-    encoding = detect_encoding(path) if encoding is None else encoding
-    with open(path, "r", encoding=encoding) as f:
+    with _open_text(path, encoding) as f:
         cfg = json.load(f)
-    return ConfigIOWrapper(cfg, "json", path=path, encoding=encoding)
+    return ConfigIOWrapper(cfg, "json", path=path, encoding=f.encoding)
 
 
 def read_ini(path: str | Path, /, encoding: str | None = None) -> ConfigIOWrapper:
@@ -146,9 +143,9 @@ def read_ini(path: str | Path, /, encoding: str | None = None) -> ConfigIOWrappe
         A wrapper for reading and writing config files.
 
     """
-    encoding = detect_encoding(path) if encoding is None else encoding
     parser = ConfigParser()
-    parser.read(path, encoding=encoding)
+    with _open_text(path, encoding) as f:
+        parser.read_file(f)
     obj = {
         s: {o: _obj_restore(parser.get(s, o)) for o in parser.options(s)}
         for s in parser.sections()
@@ -157,7 +154,7 @@ def read_ini(path: str | Path, /, encoding: str | None = None) -> ConfigIOWrappe
         obj = obj["null"]
         if len(obj) == 1 and "null" in obj:
             obj = obj["null"]
-    return ConfigIOWrapper(obj, "ini", path=path, encoding=encoding)
+    return ConfigIOWrapper(obj, "ini", path=path, encoding=f.encoding)
 
 
 def read_toml(path: str | Path, /, encoding: str | None = None) -> ConfigIOWrapper:
@@ -178,12 +175,11 @@ def read_toml(path: str | Path, /, encoding: str | None = None) -> ConfigIOWrapp
         A wrapper for reading and writing config files.
 
     """
-    encoding = detect_encoding(path) if encoding is None else encoding
-    with open(path, "r", encoding=encoding) as f:
+    with _open_text(path, encoding) as f:
         obj = toml.load(f)
     if len(obj) == 1 and "null" in obj:
         obj = obj["null"]
-    return ConfigIOWrapper(obj, "toml", path=path, encoding=encoding)
+    return ConfigIOWrapper(obj, "toml", path=path, encoding=f.encoding)
 
 
 def read_text(path: str | Path, /, encoding: str | None = None) -> ConfigIOWrapper:
@@ -204,9 +200,9 @@ def read_text(path: str | Path, /, encoding: str | None = None) -> ConfigIOWrapp
         A wrapper for reading and writing config files.
 
     """
-    encoding = detect_encoding(path) if encoding is None else encoding
-    cfg = Path(path).read_text(encoding=encoding)
-    return ConfigIOWrapper(cfg, "text", path=path, encoding=encoding)
+    with _open_text(path, encoding) as f:
+        cfg = f.read()
+    return ConfigIOWrapper(cfg, "text", path=path, encoding=f.encoding)
 
 
 def read_bytes(path: str | Path, /, encoding: str | None = None) -> ConfigIOWrapper:
@@ -227,11 +223,28 @@ def read_bytes(path: str | Path, /, encoding: str | None = None) -> ConfigIOWrap
         A wrapper for reading and writing config files.
 
     """
-    encoding = detect_encoding(path) if encoding is None else encoding
-    cfg = Path(path).read_bytes().decode(encoding)
+    data = Path(path).read_bytes()
+    if encoding is None:
+        # Same as detect_encoding(), which only looks at the first line.
+        encoding = json.detect_encoding(data[: data.find(b"\n") + 1] or data)
+    cfg = data.decode(encoding)
     return ConfigIOWrapper(cfg, "bytes", path=path, encoding=encoding)
 
 
+def _open_text(path: str | Path, encoding: str | None) -> TextIO:
+    # Opens the file only once: if not specified, the encoding is detected
+    # from the first line before the stream is switched to text mode.
+    f = open(path, "rb")
+    try:
+        if encoding is None:
+            encoding = json.detect_encoding(f.readline())
+            f.seek(0)
+        return io.TextIOWrapper(f, encoding=encoding)
+    except BaseException:
+        f.close()
+        raise
+
+
 def _obj_restore(string: str) -> "UnwrappedDataObj":
     try:
         return json.loads(string)
@@ -265,7 +278,6 @@ class ConfigReader:
         """Read from the config file."""
         if fileformat is None:
             return cls.autoread(path, encoding=encoding)
-        encoding = detect_encoding(path) if encoding is None else encoding
         if fileformat not in FORMAT_MAPPING:
             raise FileFormatError(f"unsupported config file format: {fileformat!r}")
         return cls.reader_mapping[FORMAT_MAPPING[fileformat]](path, encoding=encoding)
@@ -275,7 +287,6 @@ class ConfigReader:
         cls, path: str | Path, /, encoding: str | None = None
     ) -> ConfigIOWrapper:
         """Read from the config file, automatically detecting the fileformat."""
-        encoding = detect_encoding(path) if encoding is None else encoding
         try_methods: tuple[Callable[..., ConfigIOWrapper | None]] = (
             cls.__try_pickle,
             cls.__try_ini,
@@ -323,7 +334,7 @@ class ConfigReader:
     ) -> ConfigIOWrapper | None:
         try:
             return read_yaml(path, encoding=encoding)
-        except (ReaderError, MarkedYAMLError):
+        except (yaml.reader.ReaderError, yaml.MarkedYAMLError):
             return None
 
     @staticmethod
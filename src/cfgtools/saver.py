@@ -43,19 +43,20 @@ class ConfigSaver:
     ) -> None:
         """Save the config in a yaml file. See `self.save()` for more details."""
         with open(path, "w", encoding=encoding) as f:
-            yaml.safe_dump(self.unwrap(), f, sort_keys=False)
+            dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+            yaml.dump(self.unwrap(), f, Dumper=dumper, sort_keys=False)
 
     def to_pickle(self, path: str | Path | None = None, /) -> None:
         """Save the config in a pickle file. See `self.save()` for more details."""
-        with open(path, "wb") as f:
-            pickle.dump(self.unwrap(), f)
+        Path(path).write_bytes(
+            pickle.dumps(self.unwrap(), protocol=pickle.HIGHEST_PROTOCOL)
+        )
 
     def to_json(
         self, path: str | Path | None = None, /, encoding: str | None = None
     ) -> None:
         """Save the config in a json file. See `self.save()` for more details."""
-        with open(path, "w", encoding=encoding) as f:
-            json.dump(self.unwrap(), f)
+        Path(path).write_text(json.dumps(self.unwrap()), encoding=encoding)
 
     def to_ini(
         self, path: str | Path | None = None, /, encoding: str | None = None
@@ -1,5 +1,6 @@
 """Contains constructors for test data: ip_location(), etc."""
 
+import threading
 from typing import TYPE_CHECKING
 
 from faker import Faker
@@ -33,8 +34,7 @@ def ip_locations(
         Config object.
 
     """
-    faker = Faker()
-    faker.seed_instance(seed)
+    faker = _get_faker(seed)
     mapping = {}
     for _ in range(number_of_addresses):
         mapping[faker.ipv4()] = [faker.city()] + faker.address().splitlines()
@@ -61,8 +61,7 @@ def customer_data(
         Config object.
 
     """
-    faker = Faker()
-    faker.seed_instance(seed)
+    faker = _get_faker(seed)
     data = {}
     for _ in range(number_of_customers):
         name = faker.name()
@@ -107,8 +106,7 @@ def order_records(
         Config object.
 
     """
-    faker = Faker()
-    faker.seed_instance(seed)
+    faker = _get_faker(seed)
     data = []
     for _ in range(number_of_orders):
         name = faker.name()
@@ -129,3 +127,13 @@ def order_records(
             }
         )
     return config(data)
+
+
+def _get_faker(seed: int | None) -> Faker:
+    if (faker := getattr(_LOCAL, "faker", None)) is None:
+        faker = _LOCAL.faker = Faker()
+    faker.seed_instance(seed)
+    return faker
+
+
+_LOCAL = threading.local()